@@ -1,9 +1,16 @@
 import os
 import time
+import itertools
 import logging
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
+import httpx
+import ijson
+import orjson
 import requests
-from flask import Flask, render_template, request, jsonify, Response
+from requests.adapters import HTTPAdapter
+from flask import Flask, render_template, request, Response, stream_with_context
 from dotenv import load_dotenv, find_dotenv
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
@@ -32,6 +39,47 @@ GH_HEADERS = {
 # Configuration constants
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))
 MAX_REPOS_PER_REQUEST = int(os.getenv('MAX_REPOS_PER_REQUEST', 100))
+ALERT_FETCH_WORKERS = int(os.getenv('ALERT_FETCH_WORKERS', 16))
+GH_CACHE_TTL = int(os.getenv('GH_CACHE_TTL', 60))
+GH_CACHE_MAX_ENTRIES = int(os.getenv('GH_CACHE_MAX_ENTRIES', 1000))
+ALERT_CACHE_TTL = int(os.getenv('ALERT_CACHE_TTL', 300))
+ALERT_CACHE_MAX_ENTRIES = int(os.getenv('ALERT_CACHE_MAX_ENTRIES', 10000))
+SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+# Retry Azure AD token requests that fail to connect
+AUTH_MAX_RETRIES = 3
+
+# Retry transient GitHub gateway errors with exponential backoff
+GH_RETRY_STATUSES = (502, 503, 504)
+GH_MAX_RETRIES = 3
+GH_RETRY_BACKOFF = 0.3
+
+# ===== HTTP SESSIONS =====
+def create_auth_session():
+    """
+    Create a requests session for the Azure AD token endpoint.
+    Reusing one session keeps the connection alive so token refreshes skip
+    the TCP/TLS handshake. Only connection failures are retried; the token
+    POST is never replayed after the server has answered.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(max_retries=AUTH_MAX_RETRIES))
+    return session
+
+# GitHub calls go over HTTP/2 so concurrent alert fetches are multiplexed
+# on a single TLS connection. The transport only retries connection
+# failures; send_github_request retries gateway errors.
+GH_CLIENT = httpx.Client(
+    headers=GH_HEADERS,
+    timeout=REQUEST_TIMEOUT,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=GH_MAX_RETRIES,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+    )
+)
+AUTH_SESSION = create_auth_session()
 
 # ===== AZURE AD OAUTH2 TOKEN PROVIDER =====
 _auth_lock = Lock()
@@ -41,12 +89,19 @@ _token_expiry = 0
 def get_auth_token_provider():
     """
     Get or refresh Azure AD OAuth2 token for Azure OpenAI access.
-    Uses client credentials flow with caching for efficiency.
+    Uses client credentials flow with caching for efficiency; the lock is
+    only taken when the cached token needs refreshing.
     """
     global _cached_token, _token_expiry
     
+    # Fast path: return cached token if still valid (with 30s buffer)
+    # without taking the lock
+    token, expiry = _cached_token, _token_expiry
+    if token and time.time() < expiry - 30:
+        return token
+    
     with _auth_lock:
-        # Return cached token if still valid (with 30s buffer)
+        # Another thread may have refreshed the token while we waited
         if _cached_token and time.time() < _token_expiry - 30:
             return _cached_token
         
@@ -63,7 +118,7 @@ def get_auth_token_provider():
         
         try:
             # Request new token
-            response = requests.post(
+            response = AUTH_SESSION.post(
                 auth_url,
                 data={
                     "grant_type": "client_credentials",
@@ -113,22 +168,161 @@ def initialize_azure_openai():
         logger.error(f"Failed to initialize Azure OpenAI: {e}")
         raise RuntimeError(f"Azure OpenAI initialization failed: {e}")
 
-# Initialize LLM
-llm = initialize_azure_openai()
+_llm_lock = Lock()
+_llm = None
+
+def get_llm():
+    """
+    Return the shared Azure OpenAI client, creating it on first use.
+    Deferring construction keeps app import (and worker boot) free of
+    Azure SDK setup.
+    """
+    global _llm
+    
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = initialize_azure_openai()
+    return _llm
+
+# Prompt for AI fix suggestions, parsed once at import
+FIX_PROMPT_TEMPLATE = """Below is a Dependabot security alert. Please provide:
+
+1) A concise code fix snippet
+2) The exact file path to apply the fix
+3) Any merge conflict resolution strategy if needed
+4) Step-by-step implementation instructions
+
+Alert Details:
+- Vulnerability: {vulnerability}
+- Package: {package}
+- Severity: {severity}
+- Patched Version: {patched_in}
+- Apply Fix In: {apply_fix_in}
+
+Please provide a comprehensive but concise response with actionable steps."""
+
+FIX_PROMPT = ChatPromptTemplate.from_template(FIX_PROMPT_TEMPLATE)
 
 # ===== GITHUB API HELPERS =====
+def send_github_request(url: str, params=None, headers=None, stream=False):
+    """
+    Send a GET request to the GitHub API, retrying gateway errors.
+    
+    Responses with a status in GH_RETRY_STATUSES are retried up to
+    GH_MAX_RETRIES times with exponential backoff; the last response is
+    returned whatever its status.
+    
+    Args:
+        url: GitHub API URL
+        params: Optional query parameters
+        headers: Optional extra request headers
+        stream: Leave the body unread; the caller must close the response
+        
+    Returns:
+        httpx.Response from the final attempt
+        
+    Raises:
+        httpx.HTTPError: If the request cannot be sent
+    """
+    request = GH_CLIENT.build_request("GET", url, params=params, headers=headers)
+    
+    for attempt in range(GH_MAX_RETRIES + 1):
+        response = GH_CLIENT.send(request, stream=stream)
+        if response.status_code not in GH_RETRY_STATUSES or attempt == GH_MAX_RETRIES:
+            return response
+        
+        response.close()
+        logger.warning(f"GitHub returned {response.status_code} for {url}, retrying")
+        time.sleep(GH_RETRY_BACKOFF * 2 ** attempt)
+
+# (url, params) -> (etag, data, next_url, fetched_at), in LRU order
+_gh_cache = OrderedDict()
+_gh_cache_lock = Lock()
+
+def cached_github_get(url: str, params=None):
+    """
+    GET a GitHub API resource using conditional requests.
+    
+    Responses younger than GH_CACHE_TTL are served straight from memory.
+    Older entries are revalidated with `If-None-Match`; a 304 reply reuses
+    the cached body and does not count against the GitHub rate limit.
+    
+    Args:
+        url: GitHub API URL
+        params: Optional query parameters
+        
+    Returns:
+        Tuple of (parsed JSON body, next page URL or None)
+        
+    Raises:
+        httpx.HTTPError: If API request fails
+    """
+    key = (url, tuple(sorted(params.items())) if params else ())
+    now = time.time()
+    
+    with _gh_cache_lock:
+        cached = _gh_cache.get(key)
+        if cached:
+            _gh_cache.move_to_end(key)
+    
+    if cached and now - cached[3] < GH_CACHE_TTL:
+        return cached[1], cached[2]
+    
+    headers = {"If-None-Match": cached[0]} if cached else None
+    response = send_github_request(url, params, headers)
+    
+    if cached and response.status_code == 304:
+        store_github_cache(key, (cached[0], cached[1], cached[2], now))
+        return cached[1], cached[2]
+    
+    response.raise_for_status()
+    
+    data = orjson.loads(response.content)
+    next_url = response.links.get("next", {}).get("url")
+    
+    # Without an ETag the response cannot be revalidated, so drop any
+    # older entry rather than serving it after a later 304
+    etag = response.headers.get("ETag")
+    store_github_cache(key, (etag, data, next_url, now) if etag else None)
+    
+    return data, next_url
+
+def store_github_cache(key, entry):
+    """
+    Store or remove a GitHub response cache entry, evicting the least
+    recently used entries beyond GH_CACHE_MAX_ENTRIES.
+    
+    Args:
+        key: Cache key of (url, params)
+        entry: Tuple of (etag, data, next_url, fetched_at), or None to remove
+    """
+    with _gh_cache_lock:
+        if entry is None:
+            _gh_cache.pop(key, None)
+            return
+        
+        _gh_cache[key] = entry
+        _gh_cache.move_to_end(key)
+        while len(_gh_cache) > GH_CACHE_MAX_ENTRIES:
+            _gh_cache.popitem(last=False)
+
 def fetch_org_repos(org: str):
     """
     Fetch repositories for a given GitHub organization.
     
+    Follows the `Link: rel="next"` header so organizations with more than
+    one page of repositories are returned in full. Repositories are yielded
+    as each page arrives.
+    
     Args:
         org: GitHub organization name
         
-    Returns:
-        List of repository objects from GitHub API
+    Yields:
+        Repository objects from GitHub API
         
     Raises:
-        requests.RequestException: If API request fails
+        httpx.HTTPError: If API request fails
     """
     logger.info(f"Fetching repositories for organization: {org}")
     
@@ -138,16 +332,21 @@ def fetch_org_repos(org: str):
         "sort": "updated",
         "direction": "desc"
     }
+    repo_count = 0
     
     try:
-        response = requests.get(url, headers=GH_HEADERS, params=params, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        while url:
+            repos, next_url = cached_github_get(url, params)
+            repo_count += len(repos)
+            yield from repos
+            
+            # The next-page URL already carries the query string
+            url = next_url
+            params = None
         
-        repos = response.json()
-        logger.info(f"Successfully fetched {len(repos)} repositories for {org}")
-        return repos
+        logger.info(f"Successfully fetched {repo_count} repositories for {org}")
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to fetch repositories for {org}: {e}")
         raise
 
@@ -170,58 +369,160 @@ def fetch_code_matches(org: str, query: str):
     params = {"q": search_query}
     
     try:
-        response = requests.get(url, headers=GH_HEADERS, params=params, timeout=REQUEST_TIMEOUT)
-        
-        if response.status_code != 200:
-            logger.warning(f"Code search failed with status {response.status_code}")
-            return set()
-        
-        data = response.json()
+        data, _ = cached_github_get(url, params)
         matches = {item["repository"]["full_name"].lower() 
                   for item in data.get("items", [])}
         
         logger.info(f"Found {len(matches)} code matches")
         return matches
         
-    except requests.RequestException as e:
+    except httpx.HTTPStatusError as e:
+        logger.warning(f"Code search failed with status {e.response.status_code}")
+        return set()
+    except httpx.HTTPError as e:
         logger.error(f"Code search failed: {e}")
         return set()
 
+def is_rate_limited(response: httpx.Response):
+    """
+    Check whether a GitHub 403 response is a rate limit rather than a
+    permission or feature-disabled error.
+    
+    Args:
+        response: GitHub API response
+        
+    Returns:
+        True if GitHub asked the client to back off
+    """
+    return ("Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0")
+
 def fetch_dependabot_alerts(owner: str, repo: str):
     """
     Fetch Dependabot security alerts for a specific repository.
     
+    The response body is parsed incrementally, so alerts are yielded one
+    at a time instead of buffering the whole JSON document.
+    
     Args:
         owner: Repository owner
         repo: Repository name
         
-    Returns:
-        List of Dependabot alert objects
+    Yields:
+        Dependabot alert objects
+        
+    Raises:
+        httpx.HTTPError: If API request fails, possibly after some alerts
+            have already been yielded
+        ijson.JSONError: If the response body is not valid JSON
     """
     logger.info(f"Fetching Dependabot alerts for {owner}/{repo}")
     
     url = f"https://api.github.com/repos/{owner}/{repo}/dependabot/alerts"
     params = {"per_page": MAX_REPOS_PER_REQUEST}
+    alert_count = 0
     
     try:
-        response = requests.get(url, headers=GH_HEADERS, params=params, timeout=REQUEST_TIMEOUT)
+        response = send_github_request(url, params, stream=True)
+        try:
+            if response.status_code == 404:
+                logger.info(f"Repository {owner}/{repo} not found or no access")
+                return
+            elif response.status_code == 403 and not is_rate_limited(response):
+                logger.warning(f"Access forbidden for {owner}/{repo}")
+                return
+            
+            response.raise_for_status()
+            
+            # Feed decoded body chunks to the parser as they arrive
+            alerts = ijson.sendable_list()
+            parser = ijson.items_coro(alerts, "item")
+            for chunk in response.iter_bytes():
+                parser.send(chunk)
+                alert_count += len(alerts)
+                yield from alerts
+                del alerts[:]
+            parser.close()
+            
+            alert_count += len(alerts)
+            yield from alerts
+        finally:
+            response.close()
         
-        if response.status_code == 404:
-            logger.info(f"Repository {owner}/{repo} not found or no access")
-            return []
-        elif response.status_code == 403:
-            logger.warning(f"Access forbidden for {owner}/{repo}")
-            return []
+        logger.info(f"Successfully fetched {alert_count} alerts for {owner}/{repo}")
         
-        response.raise_for_status()
-        alerts = response.json()
+    except (httpx.HTTPError, ijson.JSONError) as e:
+        logger.error(f"Failed to fetch alerts for {owner}/{repo}: {e}")
+        raise
+
+def fetch_severity_counts(owner: str, repo: str):
+    """
+    Count Dependabot alerts by severity for a specific repository.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
         
-        logger.info(f"Successfully fetched {len(alerts)} alerts for {owner}/{repo}")
-        return alerts
+    Returns:
+        Dictionary with severity counts
         
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch alerts for {owner}/{repo}: {e}")
-        return []
+    Raises:
+        httpx.HTTPError: If the alerts could not be fetched completely
+        ijson.JSONError: If the response body is not valid JSON
+    """
+    counts = Counter()
+    
+    for alert in fetch_dependabot_alerts(owner, repo):
+        severity = alert.get("security_advisory", {}).get("severity")
+        counts[severity.lower() if severity else "low"] += 1
+    
+    return {severity: counts[severity] for severity in SEVERITY_ORDER}
+
+# (full_name, pushed_at) -> (severity counts, fetched_at), in LRU order
+_alert_cache = OrderedDict()
+_alert_cache_lock = Lock()
+
+def get_repo_severity_counts(repo: dict):
+    """
+    Get Dependabot severity counts for a repository, reusing recent results.
+    
+    Counts are cached per (full_name, pushed_at), so dormant repositories
+    skip the alerts API until ALERT_CACHE_TTL expires. The TTL still applies
+    because new advisories can raise alerts without a push. Only complete
+    fetches are cached; failures propagate and are retried on the next call.
+    
+    Args:
+        repo: Repository object from GitHub API
+        
+    Returns:
+        Dictionary with severity counts
+        
+    Raises:
+        httpx.HTTPError: If the alerts could not be fetched completely
+        ijson.JSONError: If the response body is not valid JSON
+    """
+    key = (repo["full_name"], repo.get("pushed_at"))
+    now = time.time()
+    
+    with _alert_cache_lock:
+        cached = _alert_cache.get(key)
+        if cached and now - cached[1] < ALERT_CACHE_TTL:
+            _alert_cache.move_to_end(key)
+            return cached[0]
+    
+    # Raises on any fetch failure, including rate limits, so partial or
+    # missing counts never reach the cache; 404 and permission-denied 403
+    # repositories legitimately count as empty
+    owner, name = repo["full_name"].split("/", 1)
+    severity_counts = fetch_severity_counts(owner, name)
+    
+    with _alert_cache_lock:
+        _alert_cache[key] = (severity_counts, now)
+        _alert_cache.move_to_end(key)
+        while len(_alert_cache) > ALERT_CACHE_MAX_ENTRIES:
+            _alert_cache.popitem(last=False)
+    
+    return severity_counts
 
 def get_highest_severity(counts):
     """
@@ -233,13 +534,19 @@ def get_highest_severity(counts):
     Returns:
         String representing the highest severity level
     """
-    severity_order = ["critical", "high", "medium", "low"]
-    
-    for severity in severity_order:
-        if counts.get(severity, 0) > 0:
-            return severity
+    return next((severity for severity in SEVERITY_ORDER if counts.get(severity, 0)), "low")
+
+def json_response(obj):
+    """
+    Serialize an object to a JSON response using orjson.
     
-    return "low"
+    Args:
+        obj: JSON-serializable object
+        
+    Returns:
+        Flask Response with application/json mimetype
+    """
+    return Response(orjson.dumps(obj), mimetype="application/json")
 
 # ===== FLASK APPLICATION =====
 app = Flask(
@@ -267,7 +574,8 @@ def search_repos():
         q: Search query filter
         
     Returns:
-        JSON response with repositories and summary statistics
+        JSON response with repositories, summary statistics and the names
+        of matched repositories whose alerts could not be fetched
     """
     org = request.args.get("org", "").strip()
     query = request.args.get("q", "").strip().lower()
@@ -275,15 +583,9 @@ def search_repos():
     # Validate input parameters
     if not org or not query:
         logger.warning("Missing required parameters: org or q")
-        return jsonify({"repos": [], "summary": {}})
+        return json_response({"repos": [], "summary": {}})
     
     try:
-        # Fetch all repositories for the organization
-        all_repos = fetch_org_repos(org)
-        
-        # Search for code matches
-        code_matches = fetch_code_matches(org, query)
-        
         # Filter repositories and collect security data
         matched_repos = []
         summary_stats = {
@@ -294,43 +596,58 @@ def search_repos():
             "low": 0
         }
         
-        for repo in all_repos:
-            repo_full_name = repo["full_name"].lower()
-            repo_name = repo["name"].lower()
+        # Stream repository pages and dispatch alert fetches for matches
+        # while later pages are still being downloaded
+        with ThreadPoolExecutor(max_workers=ALERT_FETCH_WORKERS) as executor:
+            # Run the code search alongside the first repository page
+            code_search = executor.submit(fetch_code_matches, org, query)
             
-            # Check if repository matches search criteria
-            if query in repo_name or repo_full_name in code_matches:
-                # Get Dependabot alerts for this repository
-                owner, name = repo["full_name"].split("/", 1)
-                alerts = fetch_dependabot_alerts(owner, name)
-                
-                # Count alerts by severity
-                severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+            pending = []
+            for repo in fetch_org_repos(org):
+                # Cheap name match first; only consult code search results
+                # (waiting on them if needed) when the name does not match
+                if query not in repo["name"].lower():
+                    code_matches = code_search.result()
+                    if not code_matches or repo["full_name"].lower() not in code_matches:
+                        continue
                 
-                for alert in alerts:
-                    severity = alert.get("security_advisory", {}).get("severity", "low").lower()
-                    if severity in severity_counts:
-                        severity_counts[severity] += 1
-                
-                # Add to summary statistics
-                for severity in severity_counts:
-                    summary_stats[severity] += severity_counts[severity]
-                
-                # Add repository to matched list
-                matched_repos.append({
-                    "full_name": repo["full_name"],
-                    "counts": severity_counts,
-                    "severity": get_highest_severity(severity_counts)
-                })
+                pending.append((repo, executor.submit(get_repo_severity_counts, repo)))
+            
+            # A failed repository is reported separately rather than failing
+            # the whole search or being shown with zero alerts
+            results = []
+            failed_repos = []
+            for repo, future in pending:
+                try:
+                    results.append((repo, future.result()))
+                except Exception as e:
+                    logger.error(f"Skipping {repo['full_name']}: alerts unavailable: {e}")
+                    failed_repos.append(repo["full_name"])
+        
+        for repo, severity_counts in results:
+            # Add to summary statistics
+            for severity in severity_counts:
+                summary_stats[severity] += severity_counts[severity]
+            
+            # Add repository to matched list
+            matched_repos.append({
+                "full_name": repo["full_name"],
+                "counts": severity_counts,
+                "severity": get_highest_severity(severity_counts)
+            })
         
         summary_stats["repos_found"] = len(matched_repos)
         
-        logger.info(f"Search completed: found {len(matched_repos)} repositories")
-        return jsonify({"repos": matched_repos, "summary": summary_stats})
+        logger.info(f"Search completed: found {len(matched_repos)} repositories, {len(failed_repos)} failed")
+        return json_response({
+            "repos": matched_repos,
+            "summary": summary_stats,
+            "failed_repos": failed_repos
+        })
         
     except Exception as e:
         logger.error(f"Repository search failed: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 @app.route("/load_alerts", methods=["POST"])
 def load_alerts():
@@ -349,43 +666,59 @@ def load_alerts():
         
         if not repo_full_name:
             logger.warning("Missing repository name in request")
-            return jsonify([])
+            return json_response([])
         
         # Parse repository owner and name
         try:
             owner, repo = repo_full_name.split("/", 1)
         except ValueError:
             logger.warning(f"Invalid repository name format: {repo_full_name}")
-            return jsonify([])
-        
-        # Fetch raw alerts from GitHub API
-        raw_alerts = fetch_dependabot_alerts(owner, repo)
+            return json_response([])
         
-        # Format alerts for frontend consumption
-        formatted_alerts = []
+        # Pull the first alert before streaming so request and HTTP errors
+        # still produce a 500 instead of a truncated 200
+        alerts = fetch_dependabot_alerts(owner, repo)
+        first_alert = next(alerts, None)
         
-        for alert in raw_alerts:
-            security_advisory = alert.get("security_advisory", {})
-            vulnerabilities = alert.get("vulnerabilities", [{}])
-            first_vulnerability = vulnerabilities[0] if vulnerabilities else {}
+        def generate_alerts():
+            """Stream formatted alerts as a JSON array."""
+            alert_count = 0
+            yield b"["
             
-            formatted_alert = {
-                "vulnerability": security_advisory.get("summary", "Unknown vulnerability"),
-                "package": first_vulnerability.get("package", {}).get("name", "Unknown package"),
-                "severity": security_advisory.get("severity", "low").lower(),
-                "patched_in": first_vulnerability.get("first_patched_version") or "N/A",
-                "apply_fix_in": "pom.xml",  # Default for demo purposes
-                "id": alert.get("number", f"alert_{len(formatted_alerts)}")
-            }
-            
-            formatted_alerts.append(formatted_alert)
+            try:
+                # Format alerts for frontend consumption as they are parsed
+                alert_stream = itertools.chain([first_alert], alerts) if first_alert is not None else ()
+                for index, alert in enumerate(alert_stream):
+                    security_advisory = alert.get("security_advisory", {})
+                    vulnerabilities = alert.get("vulnerabilities", [{}])
+                    first_vulnerability = vulnerabilities[0] if vulnerabilities else {}
+                    severity = security_advisory.get("severity")
+                    
+                    formatted_alert = {
+                        "vulnerability": security_advisory.get("summary", "Unknown vulnerability"),
+                        "package": first_vulnerability.get("package", {}).get("name", "Unknown package"),
+                        "severity": severity.lower() if severity else "low",
+                        "patched_in": first_vulnerability.get("first_patched_version") or "N/A",
+                        "apply_fix_in": "pom.xml",  # Default for demo purposes
+                        "id": alert.get("number", f"alert_{index}")
+                    }
+                    
+                    yield (b"," if index else b"") + orjson.dumps(formatted_alert)
+                    alert_count += 1
+                
+                yield b"]"
+                logger.info(f"Loaded {alert_count} alerts for {repo_full_name}")
+                
+            except Exception as e:
+                # Headers are already sent; leave the array unclosed so the
+                # client fails to parse it instead of trusting a partial list
+                logger.error(f"Alert stream for {repo_full_name} stopped after {alert_count} alerts: {e}")
         
-        logger.info(f"Loaded {len(formatted_alerts)} alerts for {repo_full_name}")
-        return jsonify(formatted_alerts)
+        return Response(stream_with_context(generate_alerts()), mimetype="application/json")
         
     except Exception as e:
         logger.error(f"Failed to load alerts: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 @app.route("/stream_fix", methods=["POST"])
 def stream_fix():
@@ -407,42 +740,19 @@ def stream_fix():
         
         if missing_fields:
             logger.warning(f"Missing required alert fields: {missing_fields}")
-            return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
+            return json_response({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
         
-        # Create AI prompt template
-        prompt_template = """Below is a Dependabot security alert. Please provide:
-
-1) A concise code fix snippet
-2) The exact file path to apply the fix
-3) Any merge conflict resolution strategy if needed
-4) Step-by-step implementation instructions
-
-Alert Details:
-- Vulnerability: {vulnerability}
-- Package: {package}
-- Severity: {severity}
-- Patched Version: {patched_in}
-- Apply Fix In: {apply_fix_in}
-
-Please provide a comprehensive but concise response with actionable steps."""
-
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        chain = prompt | llm
+        chain = FIX_PROMPT | get_llm()
         
         def generate_stream():
             """Generate streaming response from AI."""
             try:
                 logger.info(f"Starting AI fix stream for {alert.get('package')} vulnerability")
                 
-                # Invoke the AI chain and stream response
-                response = chain.invoke(alert)
-                
-                # Split response into words for streaming effect
-                words = response.content.split()
-                
-                for word in words:
-                    yield f"{word} "
-                    time.sleep(0.05)  # Small delay for streaming effect
+                # Forward tokens to the client as the model produces them
+                for chunk in chain.stream(alert):
+                    if chunk.content:
+                        yield chunk.content
                 
                 yield "\n\n✅ Analysis complete!"
                 logger.info("AI fix stream completed successfully")
@@ -462,20 +772,23 @@ Please provide a comprehensive but concise response with actionable steps."""
         
     except Exception as e:
         logger.error(f"Stream fix endpoint failed: {e}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}), 500
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({"error": "Endpoint not found"}), 404
+    return json_response({"error": "Endpoint not found"}), 404
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     logger.error(f"Internal server error: {error}")
-    return jsonify({"error": "Internal server error"}), 500
+    return json_response({"error": "Internal server error"}), 500
 
 # ===== APPLICATION STARTUP =====
+# Development server only; in production run under gunicorn, whose gevent
+# worker monkey-patches the standard library before loading the app:
+#   gunicorn -c gunicorn_conf.py app:app
 if __name__ == "__main__":
     # Configuration
     host = os.getenv('APP_HOST', '0.0.0.0')
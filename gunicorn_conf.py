@@ -0,0 +1,37 @@
+import os
+import sys
+from multiprocessing import cpu_count
+
+# ===== GUNICORN CONFIGURATION =====
+# Usage: gunicorn -c gunicorn_conf.py app:app
+
+# Bind to the same host/port settings as the development server
+bind = f"{os.getenv('APP_HOST', '0.0.0.0')}:{os.getenv('APP_PORT', 8000)}"
+
+# gevent workers let each process hold many in-flight GitHub/Azure requests.
+# The worker applies gevent's monkey patching before importing app.py, so
+# the app itself does not patch.
+worker_class = "gevent"
+workers = int(os.getenv('GUNICORN_WORKERS', cpu_count() * 2 + 1))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Keep client connections open between dashboard requests
+keepalive = 75
+
+# Restart workers that stop heartbeating; allow in-flight requests to drain
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+
+loglevel = os.getenv('LOG_LEVEL', 'INFO').lower()
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """
+    Block trio in each worker before gevent patches the standard library.
+    httpcore imports trio when it is installed, and trio crashes at import
+    once gevent has removed select.epoll; a None entry makes httpcore see
+    it as missing.
+    """
+    sys.modules.setdefault("trio", None)